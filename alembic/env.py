@@ -6,6 +6,7 @@ from sqlalchemy import pool
 from alembic import context
 from app.models import Base
 from app.database import DATABASE_URL
+from app.sharding import shard_router
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -27,8 +28,18 @@ target_metadata = Base.metadata
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
-# Override the sqlalchemy.url from alembic.ini
-config.set_main_option("sqlalchemy.url", DATABASE_URL)
+# Override the sqlalchemy.url from alembic.ini. Shards are migrated one at a
+# time with: alembic -x shard=<name> upgrade head
+shard = context.get_x_argument(as_dictionary=True).get("shard")
+if shard:
+    if shard not in shard_router.engines:
+        raise SystemExit(f"Shard '{shard}' is not configured")
+    config.set_main_option(
+        "sqlalchemy.url",
+        shard_router.engines[shard].url.render_as_string(hide_password=False).replace("%", "%%")
+    )
+else:
+    config.set_main_option("sqlalchemy.url", DATABASE_URL)
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
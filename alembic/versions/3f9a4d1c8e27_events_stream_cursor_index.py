@@ -0,0 +1,65 @@
+"""index events by account and id and notify inserts for the event stream
+
+Revision ID: 3f9a4d1c8e27
+Revises: 7c1e0b6d2f4a
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a4d1c8e27'
+down_revision = '7c1e0b6d2f4a'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_events_account_id_id"
+
+NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_rcs_event() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('rcs_events', json_build_object(
+        'account_id', NEW.account_id,
+        'id', NEW.id,
+        'callback_message_id', NEW.callback_message_id
+    )::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+NOTIFY_TRIGGER = """
+CREATE TRIGGER events_notify AFTER INSERT ON events
+FOR EACH ROW EXECUTE FUNCTION notify_rcs_event()
+"""
+
+
+def _has_index() -> bool:
+    inspector = sa.inspect(op.get_bind())
+    return any(index["name"] == INDEX_NAME for index in inspector.get_indexes("events"))
+
+
+def upgrade() -> None:
+    # Fresh databases get the index and trigger from create_all at startup
+    if not sa.inspect(op.get_bind()).has_table("events"):
+        return
+    if not _has_index():
+        op.create_index(INDEX_NAME, "events", ["account_id", "id"])
+
+    # Event stream wake-ups (LISTEN rcs_events) are PostgreSQL only
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(NOTIFY_FUNCTION)
+        op.execute("DROP TRIGGER IF EXISTS events_notify ON events")
+        op.execute(NOTIFY_TRIGGER)
+
+
+def downgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table("events"):
+        return
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS events_notify ON events")
+        op.execute("DROP FUNCTION IF EXISTS notify_rcs_event()")
+    if _has_index():
+        op.drop_index(INDEX_NAME, table_name="events")
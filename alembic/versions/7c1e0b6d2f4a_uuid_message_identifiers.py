@@ -0,0 +1,63 @@
+"""store message and event identifiers as native uuid
+
+Revision ID: 7c1e0b6d2f4a
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e0b6d2f4a'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (table, column) pairs converted between varchar and uuid
+COLUMNS = [
+    ("messages", "callback_message_id"),
+    ("events", "callback_message_id"),
+    ("events", "event_id"),
+]
+
+
+def _convert(target_type: str, using: str) -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # Fresh databases get native uuid columns from create_all at startup
+    if not inspector.has_table("messages") or not inspector.has_table("events"):
+        return
+
+    current = {column["name"]: column["type"] for column in inspector.get_columns("messages")}
+    if isinstance(current["callback_message_id"], sa.Uuid) == (target_type == "uuid"):
+        return
+
+    # The events -> messages foreign key has to be dropped while both sides change type
+    foreign_keys = [
+        fk for fk in inspector.get_foreign_keys("events")
+        if fk["referred_table"] == "messages"
+    ]
+    for fk in foreign_keys:
+        op.drop_constraint(fk["name"], "events", type_="foreignkey")
+
+    for table, column in COLUMNS:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {target_type} USING {column}::{using}"
+        )
+
+    for fk in foreign_keys:
+        op.create_foreign_key(
+            fk["name"], "events", "messages",
+            fk["constrained_columns"], fk["referred_columns"]
+        )
+
+
+def upgrade() -> None:
+    _convert("uuid", "uuid")
+
+
+def downgrade() -> None:
+    _convert("varchar", "text")
@@ -0,0 +1,57 @@
+"""store fallbacks with each message
+
+Revision ID: b52e7a9f0c13
+Revises: 3f9a4d1c8e27
+Create Date: 2026-10-19 12:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52e7a9f0c13'
+down_revision = '3f9a4d1c8e27'
+branch_labels = None
+depends_on = None
+
+
+def _columns():
+    return [
+        sa.Column("fallback", sa.JSON(none_as_null=True), nullable=True),
+        sa.Column("fallback_attempts", sa.Integer(), nullable=True),
+        sa.Column("fallback_channel", sa.String(), nullable=True),
+    ]
+
+
+INDEX_NAME = "ix_messages_status_created_at"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    # Fresh databases get the columns and index from create_all at startup
+    if not inspector.has_table("messages"):
+        return
+
+    existing = {column["name"] for column in inspector.get_columns("messages")}
+    for column in _columns():
+        if column.name not in existing:
+            op.add_column("messages", column)
+
+    if not any(index["name"] == INDEX_NAME for index in inspector.get_indexes("messages")):
+        op.create_index(INDEX_NAME, "messages", ["status", "created_at"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("messages"):
+        return
+
+    if any(index["name"] == INDEX_NAME for index in inspector.get_indexes("messages")):
+        op.drop_index(INDEX_NAME, table_name="messages")
+
+    existing = {column["name"] for column in inspector.get_columns("messages")}
+    for column in reversed(_columns()):
+        if column.name in existing:
+            op.drop_column("messages", column.name)
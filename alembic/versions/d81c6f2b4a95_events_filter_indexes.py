@@ -0,0 +1,51 @@
+"""index the filters of the events API
+
+Revision ID: d81c6f2b4a95
+Revises: b52e7a9f0c13
+Create Date: 2026-10-19 12:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81c6f2b4a95'
+down_revision = 'b52e7a9f0c13'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_events_account_id_callback_message_id": ["account_id", "callback_message_id"],
+    "ix_events_account_id_timestamp": ["account_id", "timestamp", "id"],
+    "ix_events_account_id_campaign_id_timestamp": ["account_id", "campaign_id", "timestamp"],
+    "ix_events_account_id_message_status_timestamp": ["account_id", "message_status", "timestamp"],
+    "ix_events_account_id_event_type_timestamp": ["account_id", "event_type", "timestamp"],
+    "ix_events_account_id_event_direction_timestamp": ["account_id", "event_direction", "timestamp"],
+}
+
+
+def _existing_indexes():
+    inspector = sa.inspect(op.get_bind())
+    # Fresh databases get the indexes from create_all at startup
+    if not inspector.has_table("events"):
+        return None
+    return {index["name"] for index in inspector.get_indexes("events")}
+
+
+def upgrade() -> None:
+    existing = _existing_indexes()
+    if existing is None:
+        return
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, "events", columns)
+
+
+def downgrade() -> None:
+    existing = _existing_indexes()
+    if existing is None:
+        return
+    for name in reversed(list(INDEXES)):
+        if name in existing:
+            op.drop_index(name, table_name="events")
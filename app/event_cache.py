@@ -0,0 +1,114 @@
+from collections import OrderedDict, namedtuple
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+from sqlalchemy import func
+from dotenv import load_dotenv
+import threading
+import os
+
+from . import models
+from .event_stream import event_bus
+from .identifiers import parse_uuid
+
+load_dotenv()
+
+# Maximum number of per-message event responses kept in memory
+EVENT_CACHE_SIZE = int(os.getenv("EVENT_CACHE_SIZE", "10000"))
+
+EventVersion = namedtuple("EventVersion", ["total", "etag", "last_modified"])
+
+def event_version(query) -> EventVersion:
+    """
+    Summarise the events matched by ``query`` with a single aggregate, so
+    clients can be answered without loading the rows themselves.
+    """
+    total, max_id, max_timestamp, max_created_at, max_updated_at = query.with_entities(
+        func.count(models.Event.id),
+        func.max(models.Event.id),
+        func.max(models.Event.timestamp),
+        func.max(models.Event.created_at),
+        func.max(models.Event.updated_at),
+    ).order_by(None).one()
+
+    # created_at is when a row was written: callbacks can arrive with an older timestamp
+    last_modified = max(
+        (value for value in (max_timestamp, max_created_at, max_updated_at) if value), default=None
+    )
+    if last_modified is not None and last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+
+    stamp = int(last_modified.timestamp() * 1000000) if last_modified else 0
+    return EventVersion(total, f'W/"{total}-{max_id or 0}-{stamp}"', last_modified)
+
+def version_headers(version: EventVersion) -> dict:
+    headers = {"ETag": version.etag, "Cache-Control": "private, no-cache"}
+    if version.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(version.last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+def is_not_modified(request: Request, version: EventVersion) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or version.etag in tags or version.etag[2:] in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and version.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return version.last_modified.replace(microsecond=0) <= since
+    return False
+
+def not_modified_response(version: EventVersion) -> Response:
+    return Response(status_code=304, headers=version_headers(version))
+
+class EventResultCache:
+    """
+    Bounded LRU of encoded JSON event responses keyed by (account, message).
+
+    Entries are stored with the ETag they were built for and only served while
+    it still matches; inserts signalled on the event bus drop them eagerly.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, etag: str):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != etag:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, etag: str, value):
+        if self.maxsize <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (etag, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+event_cache = EventResultCache(EVENT_CACHE_SIZE)
+
+def invalidate_on_insert(account_id: int, payload: dict = None):
+    message_uuid = parse_uuid(payload.get("callback_message_id")) if payload else None
+    if message_uuid is not None:
+        event_cache.invalidate((account_id, message_uuid))
+
+event_bus.hooks.append(invalidate_on_insert)
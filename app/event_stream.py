@@ -0,0 +1,168 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from sqlalchemy import DDL, event
+from dotenv import load_dotenv
+import os
+
+from . import models
+from .sharding import shard_router
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "rcs_events"
+
+# Seconds between keep-alive comments (and cursor re-checks) on idle streams
+HEARTBEAT_SECONDS = float(os.getenv("EVENT_STREAM_HEARTBEAT", "15"))
+
+# Maximum number of events fetched per query while catching up
+STREAM_BATCH_SIZE = int(os.getenv("EVENT_STREAM_BATCH_SIZE", "500"))
+
+# Event ids are taken before commit, so a lower id can become visible after a
+# higher one was streamed. Ids stay open for re-reads until this many seconds
+# after they were written, which must exceed the longest insert transaction.
+STREAM_SETTLE_SECONDS = float(os.getenv("EVENT_STREAM_SETTLE_SECONDS", "5"))
+
+# Existing databases get the trigger from Alembic revision 3f9a4d1c8e27
+NOTIFY_TRIGGER_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION notify_rcs_event() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{NOTIFY_CHANNEL}', json_build_object(
+            'account_id', NEW.account_id,
+            'id', NEW.id,
+            'callback_message_id', NEW.callback_message_id
+        )::text);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS events_notify ON events",
+    """
+    CREATE TRIGGER events_notify AFTER INSERT ON events
+    FOR EACH ROW EXECUTE FUNCTION notify_rcs_event()
+    """,
+]
+
+class EventBus:
+    """
+    In-process fan-out of "new events" notifications per account.
+
+    Subscribers get a single-slot queue used as a wake-up signal: the stream
+    re-reads from its own cursor, so notifications arriving while one is
+    already pending can be dropped safely. Hooks are called with every
+    notification (e.g. to invalidate caches).
+    """
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.listeners = []
+        self.hooks = []
+
+    def subscribe(self, account_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=1)
+        self.subscribers[account_id].add(queue)
+        return queue
+
+    def unsubscribe(self, account_id: int, queue: asyncio.Queue):
+        queues = self.subscribers.get(account_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self.subscribers[account_id]
+
+    def publish(self, account_id: int, payload: dict = None):
+        for hook in self.hooks:
+            hook(account_id, payload)
+        for queue in list(self.subscribers.get(account_id, ())):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                pass
+
+event_bus = EventBus()
+
+class PostgresEventListener(threading.Thread):
+    """
+    LISTENs for event inserts on one shard and forwards them to the bus.
+    """
+
+    def __init__(self, shard: str, loop: asyncio.AbstractEventLoop, bus: EventBus):
+        super().__init__(name=f"event-listener-{shard}", daemon=True)
+        self.shard = shard
+        self.loop = loop
+        self.bus = bus
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.listen()
+            except Exception:
+                logger.exception("Event listener for shard '%s' failed, reconnecting", self.shard)
+                self.stopped.wait(HEARTBEAT_SECONDS)
+
+    def listen(self):
+        connection = shard_router.engines[self.shard].raw_connection()
+        try:
+            dbapi_connection = connection.driver_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            while not self.stopped.is_set():
+                if select.select([dbapi_connection], [], [], 1.0) == ([], [], []):
+                    continue
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    notify = dbapi_connection.notifies.pop(0)
+                    payload = json.loads(notify.payload)
+                    self.loop.call_soon_threadsafe(self.bus.publish, payload["account_id"], payload)
+        finally:
+            connection.invalidate()
+
+    def stop(self):
+        self.stopped.set()
+
+def install_notify_trigger(table):
+    """
+    Create the NOTIFY trigger along with the events table on PostgreSQL, so
+    databases built by create_all get it without DDL at every startup.
+    """
+    for statement in NOTIFY_TRIGGER_DDL:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+install_notify_trigger(models.Base.metadata.tables["events"])
+install_notify_trigger(shard_router.metadata.tables["events"])
+
+def start_listeners():
+    """
+    Start a listener on every PostgreSQL shard. Other backends only get the
+    in-process bus and heartbeat re-checks.
+    """
+    loop = asyncio.get_running_loop()
+    for name, shard_engine in shard_router.engines.items():
+        if shard_engine.dialect.name != "postgresql":
+            continue
+        listener = PostgresEventListener(name, loop, event_bus)
+        listener.start()
+        event_bus.listeners.append(listener)
+
+def stop_listeners():
+    for listener in event_bus.listeners:
+        listener.stop()
+    event_bus.listeners.clear()
+
+def format_sse(data: str, event_id: int = None, event: str = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
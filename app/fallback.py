@@ -0,0 +1,243 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import load_only
+from starlette.concurrency import run_in_threadpool
+from dotenv import load_dotenv
+from typing import Dict, List, Set
+import os
+
+from . import models
+from .sharding import shard_router
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Run the fallback sweep in the API process
+FALLBACK_WORKER_ENABLED = os.getenv("FALLBACK_WORKER", "false").lower() in ("1", "true", "yes")
+FALLBACK_INTERVAL_SECONDS = float(os.getenv("FALLBACK_INTERVAL_SECONDS", "30"))
+
+# Messages still waiting for RCS delivery after this long are re-dispatched
+FALLBACK_TIMEOUT_SECONDS = float(os.getenv("FALLBACK_TIMEOUT_SECONDS", "300"))
+
+# Messages claimed per sweep query, and per call to a sender
+FALLBACK_BATCH_SIZE = int(os.getenv("FALLBACK_BATCH_SIZE", "5000"))
+FALLBACK_SEND_BATCH_SIZE = int(os.getenv("FALLBACK_SEND_BATCH_SIZE", "1000"))
+
+# RCS delivery statuses (from the message's events) that trigger the next fallback straight away
+FAILED_STATUSES = ("failed", "undelivered", "expired", "rejected")
+
+# RCS delivery statuses that mean no fallback is needed
+DELIVERED_STATUSES = ("delivered", "read")
+
+# Message statuses still waiting for an RCS delivery result; without one they
+# trigger the next fallback once FALLBACK_TIMEOUT_SECONDS passed
+WAITING_STATUSES = ("scheduled", "pending", "sent")
+
+# Message statuses that trigger the next fallback straight away
+RETRY_STATUSES = ("fallback_failed",)
+
+# Claimed by a sweep and handed to a sender. Messages left in this status by
+# a sweep that died mid-send are not retried, since they may have gone out.
+DISPATCHING_STATUS = "fallback_dispatching"
+
+FallbackMessage = namedtuple(
+    "FallbackMessage", ["message_id", "callback_message_id", "number", "text", "callback_url"]
+)
+
+class FallbackSender(ABC):
+    """
+    Delivers messages through a fallback channel (SMS, WhatsApp, ...).
+
+    ``send_batch`` receives every message of one batch for a single channel
+    and returns the ids of the messages that could not be delivered.
+    """
+
+    @abstractmethod
+    def send_batch(self, channel: str, messages: List[FallbackMessage]) -> Set[int]:
+        ...
+
+class LogFallbackSender(FallbackSender):
+    """
+    Local stub that only logs the batch and reports every message as sent.
+    """
+
+    def send_batch(self, channel: str, messages: List[FallbackMessage]) -> Set[int]:
+        logger.info("Fallback %s: dispatching %d messages", channel, len(messages))
+        return set()
+
+fallback_senders: Dict[str, FallbackSender] = {}
+default_sender = LogFallbackSender()
+
+def register_sender(channel: str, sender: FallbackSender):
+    fallback_senders[channel.upper()] = sender
+
+def sender_for(channel: str) -> FallbackSender:
+    return fallback_senders.get(channel.upper(), default_sender)
+
+def chunked(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def delivery_status():
+    """
+    Correlated subquery with the latest delivery status reported in the
+    message's events, or NULL while no event arrived.
+    """
+    Event, Message = models.Event, models.Message
+    return (
+        select(Event.message_status)
+        .where(
+            Event.account_id == Message.account_id,
+            Event.callback_message_id == Message.callback_message_id
+        )
+        .order_by(Event.timestamp.desc(), Event.id.desc())
+        .limit(1)
+        .correlate(Message)
+        .scalar_subquery()
+    )
+
+def dispatch_fallbacks(shard: str, batch_size: int = FALLBACK_BATCH_SIZE) -> int:
+    """
+    Re-dispatch one wave of failed or timed out messages on a shard.
+
+    Delivery results come from the messages' events: waiting messages whose
+    latest event reports them delivered take that status and are left alone.
+    Candidates are claimed with SKIP LOCKED so several workers can sweep the
+    same shard, and the claim (DISPATCHING_STATUS with the attempt and channel)
+    is committed before any sender runs, so a failed sweep never sends the
+    same wave twice. Claimed messages are grouped by their next fallback
+    channel, handed to the senders in batches, and their outcomes written with
+    one statement per outcome. Returns the number of messages claimed.
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(seconds=FALLBACK_TIMEOUT_SECONDS)
+    Message = models.Message
+
+    db = shard_router.session(shard)
+    try:
+        # Settle delivered messages so later sweeps no longer look at them
+        db.execute(
+            update(Message)
+            .where(
+                Message.fallback.isnot(None),
+                Message.status.in_(WAITING_STATUSES),
+                delivery_status().in_(DELIVERED_STATUSES)
+            )
+            .values(status=delivery_status(), updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+        latest_status = func.coalesce(delivery_status(), "")
+        candidates = db.query(Message).options(
+            load_only(
+                Message.id, Message.callback_message_id, Message.number,
+                Message.callback_url, Message.fallback, Message.fallback_attempts
+            )
+        ).filter(
+            Message.fallback.isnot(None),
+            or_(
+                Message.status.in_(RETRY_STATUSES),
+                and_(
+                    Message.status.in_(WAITING_STATUSES),
+                    latest_status.notin_(DELIVERED_STATUSES),
+                    or_(
+                        latest_status.in_(FAILED_STATUSES),
+                        func.coalesce(Message.schedule_to, Message.created_at) < cutoff
+                    )
+                )
+            )
+        ).order_by(Message.id).limit(batch_size).with_for_update(skip_locked=True).all()
+
+        if not candidates:
+            return 0
+
+        # Group by the next fallback channel of each message
+        groups = defaultdict(list)
+        exhausted = []
+        for message in candidates:
+            attempt = message.fallback_attempts or 0
+            if attempt >= len(message.fallback):
+                exhausted.append(message.id)
+                continue
+            fallback = message.fallback[attempt]
+            groups[fallback["channel"].upper()].append(FallbackMessage(
+                message.id, str(message.callback_message_id), message.number,
+                fallback["message"], message.callback_url
+            ))
+
+        for channel, messages in groups.items():
+            db.execute(
+                update(Message)
+                .where(Message.id.in_([message.message_id for message in messages]))
+                .values(
+                    status=DISPATCHING_STATUS,
+                    fallback_channel=channel,
+                    fallback_attempts=func.coalesce(Message.fallback_attempts, 0) + 1,
+                    updated_at=now
+                )
+                .execution_options(synchronize_session=False)
+            )
+        if exhausted:
+            db.execute(
+                update(Message)
+                .where(Message.id.in_(exhausted))
+                .values(status="undeliverable", updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+
+        outcomes = defaultdict(list)
+        for channel, messages in groups.items():
+            sender = sender_for(channel)
+            for batch in chunked(messages, FALLBACK_SEND_BATCH_SIZE):
+                try:
+                    failed = sender.send_batch(channel, batch)
+                except Exception:
+                    logger.exception("Fallback %s: batch of %d messages failed", channel, len(batch))
+                    failed = {message.message_id for message in batch}
+                for message in batch:
+                    status = "fallback_failed" if message.message_id in failed else "fallback_sent"
+                    outcomes[status].append(message.message_id)
+
+        for status, ids in outcomes.items():
+            db.execute(
+                update(Message)
+                .where(Message.id.in_(ids), Message.status == DISPATCHING_STATUS)
+                .values(status=status, updated_at=datetime.now(timezone.utc))
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        return len(candidates)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def sweep_fallbacks() -> int:
+    """
+    Dispatch fallbacks on every shard until no candidates are left.
+    """
+    total = 0
+    for shard in shard_router.shard_names:
+        while True:
+            claimed = dispatch_fallbacks(shard)
+            total += claimed
+            if claimed < FALLBACK_BATCH_SIZE:
+                break
+    return total
+
+async def fallback_worker():
+    while True:
+        try:
+            dispatched = await run_in_threadpool(sweep_fallbacks)
+            if dispatched:
+                logger.info("Fallback sweep handled %d messages", dispatched)
+        except Exception:
+            logger.exception("Fallback sweep failed")
+        await asyncio.sleep(FALLBACK_INTERVAL_SECONDS)
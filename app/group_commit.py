@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from sqlalchemy import insert
+from starlette.concurrency import run_in_threadpool
+from dotenv import load_dotenv
+from typing import Dict, List
+import os
+
+from . import models
+from .sharding import shard_router
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Coalesce message inserts from concurrent /send/ requests into shared commits
+GROUP_COMMIT_ENABLED = os.getenv("SEND_GROUP_COMMIT", "false").lower() in ("1", "true", "yes")
+GROUP_COMMIT_DELAY_MS = float(os.getenv("SEND_GROUP_COMMIT_DELAY_MS", "5"))
+GROUP_COMMIT_MAX_ROWS = int(os.getenv("SEND_GROUP_COMMIT_MAX_ROWS", "1000"))
+
+def insert_messages(shard: str, rows: List[Dict]):
+    """
+    Insert message rows on a shard with one multi-row INSERT and one commit.
+    """
+    db = shard_router.session(shard)
+    try:
+        db.execute(insert(models.Message), rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+class GroupCommitter:
+    """
+    Write-behind buffer that gathers message rows from concurrent requests.
+
+    Rows are flushed per shard once ``max_rows`` are pending or ``max_delay``
+    seconds after the first one arrived. Each caller's future resolves only
+    after the shared commit, so returned callback ids are durable. If the
+    shared insert fails, every request is retried on its own so one bad batch
+    does not fail its neighbours.
+    """
+
+    def __init__(self, max_delay: float, max_rows: int):
+        self.max_delay = max_delay
+        self.max_rows = max_rows
+        self.pending = {}
+        self.timers = {}
+        self.tasks = set()
+
+    async def insert(self, shard: str, rows: List[Dict]):
+        if not rows:
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self.pending.setdefault(shard, {"rows": 0, "requests": []})
+        batch["requests"].append((rows, future))
+        batch["rows"] += len(rows)
+
+        if batch["rows"] >= self.max_rows:
+            self.flush(shard)
+        elif shard not in self.timers:
+            self.timers[shard] = loop.call_later(self.max_delay, self.flush, shard)
+
+        await future
+
+    def flush(self, shard: str):
+        timer = self.timers.pop(shard, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self.pending.pop(shard, None)
+        if batch is None:
+            return
+        task = asyncio.get_running_loop().create_task(self.commit(shard, batch["requests"]))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def commit(self, shard: str, requests):
+        rows = [row for request_rows, _ in requests for row in request_rows]
+        try:
+            await run_in_threadpool(insert_messages, shard, rows)
+        except Exception as e:
+            if len(requests) == 1:
+                self.resolve(requests[0][1], e)
+                return
+            logger.warning("Group commit of %d rows failed, retrying per request", len(rows))
+            for request_rows, future in requests:
+                try:
+                    await run_in_threadpool(insert_messages, shard, request_rows)
+                except Exception as e:
+                    self.resolve(future, e)
+                else:
+                    self.resolve(future)
+            return
+        for _, future in requests:
+            self.resolve(future)
+
+    @staticmethod
+    def resolve(future: asyncio.Future, exception: Exception = None):
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(None)
+
+group_committer = GroupCommitter(GROUP_COMMIT_DELAY_MS / 1000, GROUP_COMMIT_MAX_ROWS) if GROUP_COMMIT_ENABLED else None
@@ -0,0 +1,60 @@
+import os
+import threading
+import time
+import uuid
+from typing import List
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+_COUNTER_MAX = 0xFFF
+
+def uuid7_batch(count: int) -> List[uuid.UUID]:
+    """
+    Generate ``count`` time-ordered UUIDv7 identifiers (RFC 9562).
+
+    The 48-bit millisecond timestamp leads, so new rows land on the right-most
+    B-tree pages. The 12-bit rand_a field is used as a counter, which keeps ids
+    strictly increasing within a process even inside one millisecond, and the
+    remaining 62 bits come from a single os.urandom call for the whole batch.
+    """
+    global _last_ms, _counter
+
+    random_bytes = os.urandom(8 * count)
+    ids = []
+    with _lock:
+        now_ms = time.time_ns() // 1000000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Start low in the counter space to leave room for this millisecond
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x1FF
+
+        for index in range(count):
+            _counter += 1
+            if _counter > _COUNTER_MAX:
+                # Counter exhausted: borrow the next millisecond to stay ordered
+                _last_ms += 1
+                _counter = 0
+            rand_b = int.from_bytes(random_bytes[index * 8:index * 8 + 8], "big") & 0x3FFFFFFFFFFFFFFF
+            value = (
+                (_last_ms & 0xFFFFFFFFFFFF) << 80
+                | 0x7 << 76
+                | _counter << 64
+                | 0b10 << 62
+                | rand_b
+            )
+            ids.append(uuid.UUID(int=value))
+    return ids
+
+def uuid7() -> uuid.UUID:
+    return uuid7_batch(1)[0]
+
+def parse_uuid(value: str):
+    """
+    Parse the string form used by the API, returning None when it is not a UUID.
+    """
+    try:
+        return uuid.UUID(value)
+    except (TypeError, ValueError, AttributeError):
+        return None
@@ -1,11 +1,22 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
+from starlette.routing import Match
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import rcs, auth
 from .database import engine, Base
+from .sharding import shard_router
+from .event_stream import start_listeners, stop_listeners
+from .fallback import FALLBACK_WORKER_ENABLED, fallback_worker
+from .query_tracer import current_route, install_query_tracer, query_tracer
+from .compression import CompressionMiddleware
 from . import models
 
 # Create tables
 Base.metadata.create_all(bind=engine)
+shard_router.create_tables()
+
+# Trace slow statements on every database when SLOW_QUERY_LOG is set
+install_query_tracer(shard_router.engines)
 
 app = FastAPI(
     title="RCS API",
@@ -24,6 +35,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (brotli when available, otherwise gzip)
+app.add_middleware(CompressionMiddleware)
+
+if query_tracer is not None:
+    @app.middleware("http")
+    async def trace_route(request: Request, call_next):
+        route_path = request.url.path
+        for route in app.router.routes:
+            match, _ = route.matches(request.scope)
+            if match == Match.FULL:
+                route_path = route.path
+                break
+        token = current_route.set(f"{request.method} {route_path}")
+        try:
+            return await call_next(request)
+        finally:
+            current_route.reset(token)
+
+@app.on_event("startup")
+async def startup():
+    start_listeners()
+    if FALLBACK_WORKER_ENABLED:
+        app.state.fallback_worker = asyncio.create_task(fallback_worker())
+
+@app.on_event("shutdown")
+async def shutdown():
+    stop_listeners()
+    worker = getattr(app.state, "fallback_worker", None)
+    if worker is not None:
+        worker.cancel()
+
 # Include routers
 app.include_router(rcs.router)
 app.include_router(auth.router)
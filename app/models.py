@@ -1,7 +1,8 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, JSON, Text
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, DateTime, JSON, Text, UniqueConstraint, Uuid
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
+from .identifiers import uuid7
 
 class User(Base):
     __tablename__ = "users"
@@ -29,6 +30,32 @@ class Account(Base):
     users = relationship("User", back_populates="account")
     messages = relationship("Message", back_populates="account")
     events = relationship("Event", back_populates="account")
+    shard = relationship("AccountShard", back_populates="account", uselist=False)
+    suppressed_numbers = relationship("SuppressedNumber", back_populates="account")
+
+class AccountShard(Base):
+    __tablename__ = "account_shards"
+
+    account_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    shard = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    account = relationship("Account", back_populates="shard")
+
+class SuppressedNumber(Base):
+    __tablename__ = "suppressed_numbers"
+
+    id = Column(Integer, primary_key=True, index=True)
+    account_id = Column(Integer, ForeignKey("accounts.id"))
+    number = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    account = relationship("Account", back_populates="suppressed_numbers")
+
+    __table_args__ = (
+        UniqueConstraint("account_id", "number", name="uq_suppressed_numbers_account_id_number"),
+    )
 
 class Template(Base):
     __tablename__ = "templates"
@@ -49,7 +76,7 @@ class Message(Base):
     __tablename__ = "messages"
 
     id = Column(Integer, primary_key=True, index=True)
-    callback_message_id = Column(String, unique=True, index=True)
+    callback_message_id = Column(Uuid, unique=True, index=True, default=uuid7)
     account_id = Column(Integer, ForeignKey("accounts.id"))
     template_id = Column(Integer, ForeignKey("templates.id"))
     campaign_name = Column(String, nullable=True)
@@ -62,19 +89,27 @@ class Message(Base):
     callback_url = Column(String, nullable=True)
     schedule_to = Column(DateTime(timezone=True), nullable=True)
     status = Column(String, default="scheduled")
+    fallback = Column(JSON(none_as_null=True), nullable=True)
+    fallback_attempts = Column(Integer, default=0)
+    fallback_channel = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     account = relationship("Account", back_populates="messages")
     template = relationship("Template", back_populates="messages")
     events = relationship("Event", back_populates="message")
+
+    __table_args__ = (
+        # Fallback sweeps look for failed or overdue messages
+        Index("ix_messages_status_created_at", "status", "created_at"),
+    )
     
 class Event(Base):
     __tablename__ = "events"
 
     id = Column(Integer, primary_key=True, index=True)
-    event_id = Column(String, unique=True, index=True)
-    callback_message_id = Column(String, ForeignKey("messages.callback_message_id"))
+    event_id = Column(Uuid, unique=True, index=True, default=uuid7)
+    callback_message_id = Column(Uuid, ForeignKey("messages.callback_message_id"))
     account_id = Column(Integer, ForeignKey("accounts.id"))
     template_id = Column(Integer, ForeignKey("templates.id"))
     campaign_name = Column(String, nullable=True)
@@ -95,3 +130,15 @@ class Event(Base):
     account = relationship("Account", back_populates="events")
     template = relationship("Template", back_populates="events")
     message = relationship("Message", back_populates="events")
+
+    __table_args__ = (
+        # Cursor reads of an account's newest events (event stream)
+        Index("ix_events_account_id_id", "account_id", "id"),
+        Index("ix_events_account_id_callback_message_id", "account_id", "callback_message_id"),
+        # Filters of the events API, each kept in timestamp order for ranges and sorting
+        Index("ix_events_account_id_timestamp", "account_id", "timestamp", "id"),
+        Index("ix_events_account_id_campaign_id_timestamp", "account_id", "campaign_id", "timestamp"),
+        Index("ix_events_account_id_message_status_timestamp", "account_id", "message_status", "timestamp"),
+        Index("ix_events_account_id_event_type_timestamp", "account_id", "event_type", "timestamp"),
+        Index("ix_events_account_id_event_direction_timestamp", "account_id", "event_direction", "timestamp"),
+    )
@@ -0,0 +1,96 @@
+from array import array
+from bisect import bisect_left
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+from typing import Iterable, List, Optional
+import re
+import threading
+import time
+import os
+
+from . import models
+
+load_dotenv()
+
+# Country code assumed for numbers sent without an international prefix
+DEFAULT_COUNTRY_CODE = os.getenv("DEFAULT_COUNTRY_CODE", "55")
+
+# Seconds a loaded suppression list is trusted before being re-read
+SUPPRESSION_CACHE_TTL = float(os.getenv("SUPPRESSION_CACHE_TTL", "60"))
+
+_SEPARATORS = re.compile(r"[\s().\-/]")
+_DIGITS = re.compile(r"\d+")
+
+def normalize_number(number: str) -> Optional[str]:
+    """
+    Normalize a phone number to E.164 (e.g. "+5511999999999").
+    Returns None when the number cannot be valid.
+    """
+    number = _SEPARATORS.sub("", number or "")
+    if number.startswith("+"):
+        digits = number[1:]
+    elif number.startswith("00"):
+        digits = number[2:]
+    else:
+        digits = number.lstrip("0")
+        if not (digits.startswith(DEFAULT_COUNTRY_CODE) and 12 <= len(digits) <= 15):
+            digits = DEFAULT_COUNTRY_CODE + digits
+
+    if not _DIGITS.fullmatch(digits) or digits[0] == "0" or not 8 <= len(digits) <= 15:
+        return None
+    return "+" + digits
+
+def normalize_numbers(numbers: Iterable[str]) -> List[Optional[str]]:
+    return [normalize_number(number) for number in numbers]
+
+def number_key(e164: str) -> int:
+    # E.164 numbers have at most 15 digits, so they fit in a signed 64-bit int
+    return int(e164[1:])
+
+class SuppressionIndex:
+    """
+    Per-account opt-out lists held as sorted arrays of 64-bit integers.
+
+    Lookups are a binary search over a compact array, so large batches can be
+    checked without touching the database. Lists are loaded lazily from the
+    ``suppressed_numbers`` table and re-read after SUPPRESSION_CACHE_TTL or
+    when this process changes them.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def load(self, db: Session, account_id: int) -> array:
+        with self.lock:
+            entry = self.entries.get(account_id)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+
+        numbers = db.query(models.SuppressedNumber.number).filter(
+            models.SuppressedNumber.account_id == account_id
+        ).all()
+        keys = array("q", sorted(number_key(number) for (number,) in numbers))
+        with self.lock:
+            self.entries[account_id] = (time.monotonic(), keys)
+        return keys
+
+    def suppressed(self, db: Session, account_id: int, numbers: Iterable[str]) -> List[bool]:
+        """
+        Check E.164 numbers against the account's suppression list.
+        """
+        keys = self.load(db, account_id)
+        size = len(keys)
+        result = []
+        for number in numbers:
+            key = number_key(number)
+            position = bisect_left(keys, key)
+            result.append(position < size and keys[position] == key)
+        return result
+
+    def invalidate(self, account_id: int):
+        with self.lock:
+            self.entries.pop(account_id, None)
+
+suppression_index = SuppressionIndex(SUPPRESSION_CACHE_TTL)
@@ -0,0 +1,119 @@
+import json
+import logging
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from sqlalchemy import event
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# JSONL file receiving slow statements; tracing is off when unset
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+# Fraction of slow SELECTs re-run under EXPLAIN (ANALYZE, BUFFERS)
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", "0.1"))
+
+# Row-locking SELECTs are explained without ANALYZE
+LOCKING_CLAUSE = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE|KEY\s+SHARE)\b", re.IGNORECASE)
+
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+
+# Route of the request being served, set by the HTTP middleware
+current_route: ContextVar[str] = ContextVar("current_route", default=None)
+
+class QueryTracer:
+    """
+    Logs statements slower than ``threshold_ms`` with their parameters and
+    originating route, plus a sampled execution plan on PostgreSQL.
+
+    Records are written (and plans captured) on a background thread, so the
+    request that ran the statement only pays for the timing itself.
+    """
+
+    def __init__(self, path: str, threshold_ms: float, explain_rate: float):
+        self.threshold = threshold_ms / 1000
+        self.explain_rate = explain_rate
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-tracer")
+        self.log = logging.getLogger("app.slow_queries")
+        self.log.propagate = False
+        self.log.setLevel(logging.INFO)
+        handler = RotatingFileHandler(path, maxBytes=SLOW_QUERY_LOG_MAX_BYTES, backupCount=SLOW_QUERY_LOG_BACKUPS)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.log.addHandler(handler)
+
+    def install(self, name: str, engine):
+        event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(engine, "after_cursor_execute",
+                     lambda *args: self.after_cursor_execute(name, engine, *args))
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_tracer_start = time.perf_counter()
+
+    def after_cursor_execute(self, name, engine, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_query_tracer_start", None)
+        if start is None or context.execution_options.get("query_tracer_skip"):
+            return
+        elapsed = time.perf_counter() - start
+        if elapsed < self.threshold:
+            return
+
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(elapsed * 1000, 3),
+            "shard": name,
+            "route": current_route.get(),
+            "statement": statement,
+            "parameters": parameters,
+            "executemany": executemany,
+        }
+        explain = (
+            engine.dialect.name == "postgresql"
+            and not executemany
+            and statement.lstrip().upper().startswith("SELECT")
+            and random.random() < self.explain_rate
+        )
+        self.executor.submit(self.write, engine, record, explain)
+
+    def write(self, engine, record: dict, explain: bool):
+        if explain:
+            # ANALYZE would take the row locks of SELECT ... FOR UPDATE/SHARE
+            # (e.g. the fallback sweep claims), so those only get the plan
+            analyze = LOCKING_CLAUSE.search(record["statement"]) is None
+            record["plan"] = self.explain(engine, record["statement"], record["parameters"], analyze)
+        self.log.info(json.dumps(record, default=str))
+
+    @staticmethod
+    def explain(engine, statement: str, parameters, analyze: bool = True):
+        # ANALYZE executes the statement again, so it is rolled back and
+        # only ever applied to SELECTs without locking clauses.
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+        try:
+            with engine.connect() as conn:
+                conn = conn.execution_options(query_tracer_skip=True)
+                plan = conn.exec_driver_sql(
+                    f"EXPLAIN ({options}) " + statement, parameters
+                ).scalar()
+                conn.rollback()
+                return plan
+        except Exception as e:
+            logger.warning("Could not capture plan for slow query: %s", e)
+            return None
+
+query_tracer = QueryTracer(SLOW_QUERY_LOG, SLOW_QUERY_MS, SLOW_QUERY_EXPLAIN_RATE) if SLOW_QUERY_LOG else None
+
+def install_query_tracer(engines: dict):
+    if query_tracer is None:
+        return
+    for name, engine in engines.items():
+        query_tracer.install(name, engine)
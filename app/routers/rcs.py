@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Header, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, load_only
+from typing import Dict, List, Optional, Set, Union
+import asyncio
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from .. import models, schemas, auth
-from ..database import get_db
+from ..database import SessionLocal, get_db
+from ..sharding import get_shard_db, shard_router
+from ..event_stream import event_bus, format_sse, HEARTBEAT_SECONDS, STREAM_BATCH_SIZE, STREAM_SETTLE_SECONDS
+from ..group_commit import group_committer
+from ..numbers import normalize_number, normalize_numbers, suppression_index
+from ..identifiers import parse_uuid, uuid7_batch
+from ..event_cache import event_cache, event_version, is_not_modified, not_modified_response, version_headers
 
 router = APIRouter(
     prefix="/v1/rcs",
@@ -13,11 +25,133 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+def event_to_schema(event: models.Event, template_name: str) -> schemas.Event:
+    return schemas.Event(
+        eventId=str(event.event_id),
+        callbackMessageId=str(event.callback_message_id),
+        campaignName=event.campaign_name,
+        campaignId=event.campaign_id,
+        templateId=str(event.template_id),
+        templateName=template_name,
+        accountId=event.account_id,
+        channel=event.channel,
+        channelType=event.channel_type,
+        messageText=event.message_text,
+        messageStatus=event.message_status,
+        eventType=event.event_type,
+        eventValue=event.event_value,
+        eventDirection=event.event_direction,
+        callbackUrl=event.callback_url,
+        scheduleTo=event.schedule_to,
+        createdAt=event.created_at,
+        updatedAt=event.updated_at,
+        timestamp=event.timestamp
+    )
+
+# Event response fields and the column each one is read from
+EVENT_FIELD_COLUMNS = {
+    "eventId": models.Event.event_id,
+    "callbackMessageId": models.Event.callback_message_id,
+    "campaignName": models.Event.campaign_name,
+    "campaignId": models.Event.campaign_id,
+    "templateId": models.Event.template_id,
+    "templateName": models.Event.template_id,
+    "accountId": models.Event.account_id,
+    "channel": models.Event.channel,
+    "channelType": models.Event.channel_type,
+    "messageText": models.Event.message_text,
+    "messageStatus": models.Event.message_status,
+    "eventType": models.Event.event_type,
+    "eventValue": models.Event.event_value,
+    "eventDirection": models.Event.event_direction,
+    "callbackUrl": models.Event.callback_url,
+    "scheduleTo": models.Event.schedule_to,
+    "createdAt": models.Event.created_at,
+    "updatedAt": models.Event.updated_at,
+    "timestamp": models.Event.timestamp,
+}
+
+def parse_fields(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """
+    Parse the ``fields`` selector (repeated and/or comma separated names).
+    """
+    if not fields:
+        return None
+    names = [name.strip() for value in fields for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in EVENT_FIELD_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(names)) or None
+
+def project_events(query, fields: Optional[List[str]]):
+    # Only load the columns behind the selected fields; the rest stay unloaded
+    if not fields:
+        return query
+    return query.options(load_only(*{EVENT_FIELD_COLUMNS[name] for name in fields}))
+
+def event_to_fields(event: models.Event, fields: List[str], template_names: Dict[int, str]) -> dict:
+    values = {}
+    for name in fields:
+        if name == "templateName":
+            values[name] = template_names.get(event.template_id, "Unknown")
+        elif name == "templateId":
+            values[name] = str(event.template_id)
+        else:
+            value = getattr(event, EVENT_FIELD_COLUMNS[name].key)
+            values[name] = str(value) if isinstance(value, uuid.UUID) else value
+    return values
+
+def load_template_names(db: Session, events: List[models.Event], fields: Optional[List[str]] = None) -> Dict[int, str]:
+    """
+    Look up the names of the templates used by a page of events in one query.
+    """
+    if fields and "templateName" not in fields:
+        return {}
+    template_ids = {event.template_id for event in events}
+    if not template_ids:
+        return {}
+    return dict(
+        db.query(models.Template.id, models.Template.name).filter(models.Template.id.in_(template_ids)).all()
+    )
+
+def compact_events(account_id: int, event_list: List[schemas.Event], total: int, page: int, limit: int) -> schemas.CompactEventsResponse:
+    """
+    Factor the per-campaign fields of a page out into a campaigns header,
+    with each event pointing at its entry by index.
+    """
+    campaign_fields = set(schemas.EventCampaign.model_fields)
+    event_fields = set(schemas.CompactEvent.model_fields) - {"campaign"}
+    campaigns = {}
+    events = []
+    for event in event_list:
+        campaign = schemas.EventCampaign(**event.model_dump(include=campaign_fields))
+        key = tuple(campaign.model_dump().values())
+        index = campaigns.setdefault(key, (len(campaigns), campaign))[0]
+        events.append(schemas.CompactEvent(campaign=index, **event.model_dump(include=event_fields)))
+    return schemas.CompactEventsResponse(
+        accountId=account_id,
+        campaigns=[campaign for _, campaign in campaigns.values()],
+        events=events,
+        total=total,
+        page=page,
+        limit=limit
+    )
+
+def add_message_error(response: schemas.RcsSendResponse, number: str, error_message: str):
+    response.messages["errors"].append(
+        schemas.MessageError(
+            number=number,
+            errorMessage=error_message
+        )
+    )
+    response.return_numberErrors += 1
+
 @router.post("/send/", response_model=schemas.RcsSendResponse)
 async def send_rcs(
     request: schemas.RcsSendRequest,
     account: models.Account = Depends(auth.verify_token),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    shard_db: Session = Depends(get_shard_db)
 ):
     """
     Send RCS messages using the specified template.
@@ -31,6 +165,9 @@ async def send_rcs(
     - **callbackUrl**: Optional URL for event callbacks
     - **fallback**: Optional fallback configuration if RCS fails
     - **messages**: Array of messages to send with recipient numbers and variables
+    
+    Numbers are normalized to E.164. Invalid numbers, numbers on the account's
+    suppression list and repeated numbers are reported in the errors list.
     """
     
     # Verify account ID matches the authenticated account
@@ -38,7 +175,9 @@ async def send_rcs(
         raise HTTPException(status_code=403, detail="Account ID does not match authenticated account")
     
     # Check if template exists
-    template = db.query(models.Template).filter(models.Template.template_id == request.templateId).first()
+    template = db.query(models.Template).options(load_only(models.Template.id)).filter(
+        models.Template.template_id == request.templateId
+    ).first()
     if not template:
         raise HTTPException(status_code=404, detail=f"Template with ID {request.templateId} not found")
     
@@ -58,51 +197,76 @@ async def send_rcs(
         }
     )
     
-    # Process each message
-    for msg in request.messages:
-        try:
-            # Generate a unique callback message ID
-            callback_message_id = str(uuid.uuid4())
-            
-            # Create message record
-            db_message = models.Message(
-                callback_message_id=callback_message_id,
-                account_id=account.id,
-                template_id=template.id,
-                campaign_name=request.campaignName,
-                campaign_id=request.campaignId,
-                channel=request.channel,
-                channel_type=request.channelType,
-                number=msg.number,
-                message_text=msg.message,
-                variables=msg.vars,
-                callback_url=request.callbackUrl,
-                schedule_to=msg.scheduleTo,
-                status="scheduled" if msg.scheduleTo and msg.scheduleTo > datetime.now() else "pending"
-            )
-            
-            db.add(db_message)
-            db.commit()
-            db.refresh(db_message)
-            
-            # Add to success list
+    # Normalize numbers and check them against the account's suppression list
+    numbers = normalize_numbers(msg.number for msg in request.messages)
+    suppressed = suppression_index.suppressed(db, account.id, [number for number in numbers if number])
+    suppressed = iter(suppressed)
+    
+    # Fallbacks are stored with every message so failed deliveries can be rerouted
+    fallback = [item.model_dump() for item in request.fallback] if request.fallback else None
+    
+    # Time-ordered callback message IDs, generated in one batch
+    callback_message_ids = iter(uuid7_batch(len(request.messages)))
+    
+    # Build a row for each message
+    rows = []
+    requested_numbers = []
+    seen = set()
+    for msg, number in zip(request.messages, numbers):
+        if number is None:
+            add_message_error(response, msg.number, "Invalid phone number")
+            continue
+        if next(suppressed):
+            add_message_error(response, msg.number, "Number is on the suppression list")
+            continue
+        if number in seen:
+            add_message_error(response, msg.number, "Duplicate number in request")
+            continue
+        seen.add(number)
+        
+        rows.append({
+            "callback_message_id": next(callback_message_ids),
+            "account_id": account.id,
+            "template_id": template.id,
+            "campaign_name": request.campaignName,
+            "campaign_id": request.campaignId,
+            "channel": request.channel,
+            "channel_type": request.channelType,
+            "number": number,
+            "message_text": msg.message,
+            "variables": msg.vars,
+            "callback_url": request.callbackUrl,
+            "schedule_to": msg.scheduleTo,
+            "status": "scheduled" if msg.scheduleTo and msg.scheduleTo > datetime.now(msg.scheduleTo.tzinfo) else "pending",
+            "fallback": fallback
+        })
+        requested_numbers.append(msg.number)
+    
+    # Store all rows with a single multi-row insert, shared with concurrent
+    # requests when group commit is enabled
+    try:
+        if group_committer is not None:
+            shard = shard_router.shard_for(db, account.id)
+            # Hand the pooled connections back while waiting for the shared commit
+            shard_db.close()
+            db.close()
+            await group_committer.insert(shard, rows)
+        elif rows:
+            shard_db.execute(insert(models.Message), rows)
+            shard_db.commit()
+    except Exception as e:
+        shard_db.rollback()
+        for requested_number in requested_numbers:
+            add_message_error(response, requested_number, str(e))
+    else:
+        for requested_number, row in zip(requested_numbers, rows):
             response.messages["successes"].append(
                 schemas.MessageSuccess(
-                    number=msg.number,
-                    callbackMessageId=callback_message_id
+                    number=requested_number,
+                    callbackMessageId=str(row["callback_message_id"])
                 )
             )
             response.return_numberSuccesses += 1
-            
-        except Exception as e:
-            # Add to error list
-            response.messages["errors"].append(
-                schemas.MessageError(
-                    number=msg.number,
-                    errorMessage=str(e)
-                )
-            )
-            response.return_numberErrors += 1
     
     # If all messages failed, update return code
     if response.return_numberSuccesses == 0 and response.return_numberErrors > 0:
@@ -115,64 +279,177 @@ async def send_rcs(
     
     return response
 
-@router.get("/events/", response_model=schemas.EventsResponse)
+@router.post("/suppressions/", response_model=schemas.SuppressionResponse)
+async def add_suppressions(
+    request: schemas.SuppressionRequest,
+    account: models.Account = Depends(auth.verify_token),
+    db: Session = Depends(get_db)
+):
+    """
+    Add numbers to the account's suppression (opt-out) list.
+    
+    - **numbers**: Numbers that must no longer receive messages
+    """
+    numbers = set()
+    invalid_numbers = []
+    for raw_number, number in zip(request.numbers, normalize_numbers(request.numbers)):
+        if number is None:
+            invalid_numbers.append(raw_number)
+        else:
+            numbers.add(number)
+    
+    if numbers:
+        # Numbers already on the list (or added by a concurrent request) are skipped
+        db.execute(
+            pg_insert(models.SuppressedNumber)
+            .values([{"account_id": account.id, "number": number} for number in sorted(numbers)])
+            .on_conflict_do_nothing(index_elements=["account_id", "number"])
+        )
+        db.commit()
+        suppression_index.invalidate(account.id)
+    
+    return schemas.SuppressionResponse(numbers=sorted(numbers), invalidNumbers=invalid_numbers)
+
+@router.delete("/suppressions/{number}", response_model=schemas.SuppressionResponse)
+async def remove_suppression(
+    number: str = Path(..., description="Number to remove from the suppression list"),
+    account: models.Account = Depends(auth.verify_token),
+    db: Session = Depends(get_db)
+):
+    """
+    Remove a number from the account's suppression (opt-out) list.
+    
+    - **number**: The number to remove
+    """
+    normalized = normalize_number(number)
+    deleted = 0
+    if normalized:
+        deleted = db.query(models.SuppressedNumber).filter(
+            models.SuppressedNumber.account_id == account.id,
+            models.SuppressedNumber.number == normalized
+        ).delete(synchronize_session=False)
+        db.commit()
+    
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Number {number} is not on the suppression list")
+    
+    suppression_index.invalidate(account.id)
+    return schemas.SuppressionResponse(numbers=[normalized])
+
+@router.get(
+    "/events/",
+    response_model=Union[schemas.EventsResponse, schemas.CompactEventsResponse, schemas.ProjectedEventsResponse]
+)
 async def get_events(
+    request: Request,
+    response: Response,
     limit: int = Query(100, description="Maximum number of events to return"),
     page: int = Query(1, description="Page number"),
-    callbackUserId: Optional[List[str]] = Query(None, description="Filter by callback user IDs"),
+    callbackUserId: Optional[List[str]] = Query(None, description="Filter by callback message IDs (deprecated, use callbackMessageId)"),
+    callbackMessageId: Optional[List[str]] = Query(None, description="Filter by callback message IDs"),
+    campaignId: Optional[List[str]] = Query(None, description="Filter by campaign IDs"),
+    messageStatus: Optional[List[str]] = Query(None, description="Filter by message statuses"),
+    eventType: Optional[List[str]] = Query(None, description="Filter by event types"),
+    eventDirection: Optional[List[str]] = Query(None, description="Filter by event directions"),
+    from_: Optional[datetime] = Query(None, alias="from", description="Only events at or after this timestamp"),
+    to: Optional[datetime] = Query(None, description="Only events before this timestamp"),
+    sort: str = Query("asc", pattern="^(asc|desc)$", description="Order by timestamp: asc or desc"),
+    fields: Optional[List[str]] = Query(None, description="Only return these event fields"),
+    compact: bool = Query(False, description="Send campaign fields once per page instead of on every event"),
     account: models.Account = Depends(auth.verify_token),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    shard_db: Session = Depends(get_shard_db)
 ):
     """
     Get RCS events with optional filtering.
     
     - **limit**: Maximum number of events to return
     - **page**: Page number for pagination
-    - **callbackUserId**: Optional list of callback user IDs to filter by
+    - **callbackMessageId**: Optional list of callback message IDs to filter by
+    - **campaignId**: Optional list of campaign IDs to filter by
+    - **messageStatus**: Optional list of message statuses to filter by
+    - **eventType**: Optional list of event types to filter by
+    - **eventDirection**: Optional list of event directions to filter by
+    - **from** / **to**: Optional timestamp range (from inclusive, to exclusive)
+    - **sort**: Order by event timestamp, `asc` (default) or `desc`
+    - **fields**: Optional list of event fields to return (e.g. `eventId,messageStatus`);
+      columns behind other fields are not loaded
+    - **compact**: Return a `CompactEventsResponse`, where campaign, template,
+      channel and callback URL fields are listed once in `campaigns` and each
+      event references its entry by index
+    
+    Responses carry `ETag` and `Last-Modified` headers; conditional requests
+    answer `304 Not Modified` while no matching event was added or updated.
     """
     
     # Calculate offset for pagination
     offset = (page - 1) * limit
+    fields = parse_fields(fields)
+    if fields and compact:
+        raise HTTPException(status_code=422, detail="compact cannot be combined with fields")
     
     # Build query
-    query = db.query(models.Event).filter(models.Event.account_id == account.id)
+    query = shard_db.query(models.Event).filter(models.Event.account_id == account.id)
     
     # Apply filters if provided
-    if callbackUserId:
-        query = query.filter(models.Event.callback_message_id.in_(callbackUserId))
+    callback_message_ids = (callbackMessageId or []) + (callbackUserId or [])
+    if callback_message_ids:
+        # IDs that are not UUIDs cannot match any event
+        callback_message_ids = [parse_uuid(value) for value in callback_message_ids]
+        query = query.filter(models.Event.callback_message_id.in_(
+            [value for value in callback_message_ids if value is not None]
+        ))
+    if campaignId:
+        query = query.filter(models.Event.campaign_id.in_(campaignId))
+    if messageStatus:
+        query = query.filter(models.Event.message_status.in_(messageStatus))
+    if eventType:
+        query = query.filter(models.Event.event_type.in_(eventType))
+    if eventDirection:
+        query = query.filter(models.Event.event_direction.in_(eventDirection))
+    if from_:
+        query = query.filter(models.Event.timestamp >= from_)
+    if to:
+        query = query.filter(models.Event.timestamp < to)
     
-    # Get total count
-    total = query.count()
+    # Get total count and version for conditional requests
+    version = event_version(query)
+    if is_not_modified(request, version):
+        return not_modified_response(version)
+    response.headers.update(version_headers(version))
+    total = version.total
     
-    # Apply pagination
-    events = query.offset(offset).limit(limit).all()
+    # Apply ordering and pagination
+    if sort == "desc":
+        query = query.order_by(models.Event.timestamp.desc(), models.Event.id.desc())
+    else:
+        query = query.order_by(models.Event.timestamp, models.Event.id)
+    events = project_events(query, fields).offset(offset).limit(limit).all()
+    template_names = load_template_names(db, events, fields)
+    
+    # Projected pages only carry the selected fields
+    if fields:
+        return JSONResponse(
+            content=jsonable_encoder({
+                "events": [event_to_fields(event, fields, template_names) for event in events],
+                "total": total,
+                "page": page,
+                "limit": limit
+            }),
+            headers=version_headers(version)
+        )
     
     # Convert to response schema
-    event_list = []
-    for event in events:
-        template = db.query(models.Template).filter(models.Template.id == event.template_id).first()
-        
-        event_list.append(schemas.Event(
-            eventId=event.event_id,
-            callbackMessageId=event.callback_message_id,
-            campaignName=event.campaign_name,
-            campaignId=event.campaign_id,
-            templateId=str(event.template_id),
-            templateName=template.name if template else "Unknown",
-            accountId=event.account_id,
-            channel=event.channel,
-            channelType=event.channel_type,
-            messageText=event.message_text,
-            messageStatus=event.message_status,
-            eventType=event.event_type,
-            eventValue=event.event_value,
-            eventDirection=event.event_direction,
-            callbackUrl=event.callback_url,
-            scheduleTo=event.schedule_to,
-            createdAt=event.created_at,
-            updatedAt=event.updated_at,
-            timestamp=event.timestamp
-        ))
+    event_list = [
+        event_to_schema(event, template_names.get(event.template_id, "Unknown"))
+        for event in events
+    ]
+    
+    if compact:
+        return JSONResponse(
+            content=jsonable_encoder(compact_events(account.id, event_list, total, page, limit)),
+            headers=version_headers(version)
+        )
     
     return schemas.EventsResponse(
         events=event_list,
@@ -181,63 +458,217 @@ async def get_events(
         limit=limit
     )
 
-@router.get("/events/{callback_message_id}", response_model=schemas.EventsResponse)
+def settled_cursor(rows, cursor: int, handled: Set[int], now: datetime) -> int:
+    """
+    Move ``cursor`` over the handled ids (in id order) written more than
+    STREAM_SETTLE_SECONDS ago. Ids are taken before commit, so a lower id may
+    still become visible; past that delay its transaction has ended.
+    """
+    horizon = now - timedelta(seconds=STREAM_SETTLE_SECONDS)
+    for event_id, created_at in rows:
+        if event_id not in handled or created_at > horizon:
+            break
+        cursor = event_id
+    return cursor
+
+def stream_start(shard: str, account_id: int):
+    """
+    Settled cursor for a stream without resume id, and the newer ids that
+    already exist and must not be sent.
+    """
+    shard_db = shard_router.session(shard)
+    try:
+        now = shard_db.scalar(select(func.now()))
+        cursor = shard_db.query(func.max(models.Event.id)).filter(
+            models.Event.account_id == account_id,
+            models.Event.created_at <= now - timedelta(seconds=STREAM_SETTLE_SECONDS)
+        ).scalar() or 0
+        existing = set(shard_db.scalars(
+            select(models.Event.id).where(models.Event.account_id == account_id, models.Event.id > cursor)
+        ))
+    finally:
+        shard_db.close()
+    return cursor, existing
+
+def fetch_events_after(shard: str, account_id: int, cursor: int, sent: Set[int], template_names: Dict[int, str]):
+    """
+    Load the account's events with id > cursor that were not sent yet, in id
+    order, as (id, json) pairs, together with the new settled cursor.
+    """
+    shard_db = shard_router.session(shard)
+    try:
+        now = shard_db.scalar(select(func.now()))
+        # Sent ids above the cursor are re-read so late commits below them show up
+        rows = shard_db.query(models.Event.id, models.Event.created_at).filter(
+            models.Event.account_id == account_id,
+            models.Event.id > cursor
+        ).order_by(models.Event.id).limit(len(sent) + STREAM_BATCH_SIZE).all()
+        new_ids = [event_id for event_id, _ in rows if event_id not in sent][:STREAM_BATCH_SIZE]
+        events = []
+        if new_ids:
+            events = shard_db.query(models.Event).filter(
+                models.Event.id.in_(new_ids)
+            ).order_by(models.Event.id).all()
+    finally:
+        shard_db.close()
+
+    settled = settled_cursor(rows, cursor, sent | set(new_ids), now)
+
+    missing = {event.template_id for event in events} - set(template_names)
+    if missing:
+        db = SessionLocal()
+        try:
+            for template in db.query(models.Template).filter(models.Template.id.in_(missing)):
+                template_names[template.id] = template.name
+        finally:
+            db.close()
+
+    return [
+        (event.id, event_to_schema(event, template_names.get(event.template_id, "Unknown")).model_dump_json())
+        for event in events
+    ], settled
+
+async def event_stream(request: Request, shard: str, account_id: int, cursor: int, sent: Set[int]):
+    template_names = {}
+    queue = event_bus.subscribe(account_id)
+    try:
+        while True:
+            events, settled = await run_in_threadpool(
+                fetch_events_after, shard, account_id, cursor, sent, template_names
+            )
+            for event_id, data in events:
+                # Resuming from the stream id must not skip ids that are not settled yet
+                yield format_sse(data, event_id=min(event_id, settled), event="event")
+                sent.add(event_id)
+            cursor = settled
+            sent = {event_id for event_id in sent if event_id > cursor}
+            if len(events) == STREAM_BATCH_SIZE:
+                continue
+            if await request.is_disconnected():
+                break
+            try:
+                await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+    finally:
+        event_bus.unsubscribe(account_id, queue)
+
+@router.get("/events/stream")
+async def stream_events(
+    request: Request,
+    lastEventId: Optional[int] = Query(None, description="Resume after this stream event id"),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+    account: models.Account = Depends(auth.verify_token),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream new RCS events for the authenticated account as Server-Sent Events.
+    
+    - **lastEventId**: Optional stream id to resume from (the `Last-Event-ID` header is also honoured)
+    
+    Each event is sent with a stream id, so reconnecting clients receive every
+    event written after the last one they saw. Stream ids never move past
+    events that may still be committing, so a resumed stream can repeat a few
+    events; use `eventId` to skip duplicates. Without a resume id only events
+    created after the connection are sent.
+    """
+    shard = shard_router.shard_for(db, account.id)
+    cursor = last_event_id if last_event_id is not None else lastEventId
+    sent = set()
+    if cursor is None:
+        cursor, sent = stream_start(shard, account.id)
+    
+    # Dependencies are only closed once the stream ends, so hand the pooled
+    # connection back now; the stream opens short sessions per read
+    db.close()
+
+    return StreamingResponse(
+        event_stream(request, shard, account.id, cursor, sent),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get(
+    "/events/{callback_message_id}",
+    response_model=Union[schemas.EventsResponse, schemas.ProjectedEventsResponse]
+)
 async def get_event_by_id(
+    request: Request,
+    response: Response,
     callback_message_id: str = Path(..., description="Callback message ID to filter by"),
+    fields: Optional[List[str]] = Query(None, description="Only return these event fields"),
     account: models.Account = Depends(auth.verify_token),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    shard_db: Session = Depends(get_shard_db)
 ):
     """
     Get RCS events for a specific callback message ID.
     
     - **callback_message_id**: The callback message ID to filter by
+    - **fields**: Optional list of event fields to return (e.g. `eventId,messageStatus`)
+    
+    Responses carry `ETag` and `Last-Modified` headers; conditional requests
+    answer `304 Not Modified` while no event was added for the message.
     """
     
+    not_found = HTTPException(status_code=404, detail=f"No events found for callback message ID: {callback_message_id}")
+    message_uuid = parse_uuid(callback_message_id)
+    if message_uuid is None:
+        raise not_found
+    fields = parse_fields(fields)
+    
     # Build query
-    query = db.query(models.Event).filter(
+    query = shard_db.query(models.Event).filter(
         models.Event.account_id == account.id,
-        models.Event.callback_message_id == callback_message_id
+        models.Event.callback_message_id == message_uuid
     )
     
-    # Get total count
-    total = query.count()
+    # Get total count and version for conditional requests
+    version = event_version(query)
+    if version.total == 0:
+        raise not_found
+    if is_not_modified(request, version):
+        return not_modified_response(version)
+    response.headers.update(version_headers(version))
+    total = version.total
+    
+    # Projected responses are cheap to build and are not cached
+    if fields:
+        events = project_events(query, fields).all()
+        template_names = load_template_names(db, events, fields)
+        return JSONResponse(
+            content=jsonable_encoder({
+                "events": [event_to_fields(event, fields, template_names) for event in events],
+                "total": total,
+                "page": 1,
+                "limit": len(events)
+            }),
+            headers=version_headers(version)
+        )
+    
+    # Serve from cache while the events are unchanged
+    cache_key = (account.id, message_uuid)
+    cached = event_cache.get(cache_key, version.etag)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json", headers=version_headers(version))
     
     # Get events
     events = query.all()
-    
-    if not events:
-        raise HTTPException(status_code=404, detail=f"No events found for callback message ID: {callback_message_id}")
+    template_names = load_template_names(db, events)
     
     # Convert to response schema
-    event_list = []
-    for event in events:
-        template = db.query(models.Template).filter(models.Template.id == event.template_id).first()
-        
-        event_list.append(schemas.Event(
-            eventId=event.event_id,
-            callbackMessageId=event.callback_message_id,
-            campaignName=event.campaign_name,
-            campaignId=event.campaign_id,
-            templateId=str(event.template_id),
-            templateName=template.name if template else "Unknown",
-            accountId=event.account_id,
-            channel=event.channel,
-            channelType=event.channel_type,
-            messageText=event.message_text,
-            messageStatus=event.message_status,
-            eventType=event.event_type,
-            eventValue=event.event_value,
-            eventDirection=event.event_direction,
-            callbackUrl=event.callback_url,
-            scheduleTo=event.schedule_to,
-            createdAt=event.created_at,
-            updatedAt=event.updated_at,
-            timestamp=event.timestamp
-        ))
+    event_list = [
+        event_to_schema(event, template_names.get(event.template_id, "Unknown"))
+        for event in events
+    ]
     
-    return schemas.EventsResponse(
+    result = schemas.EventsResponse(
         events=event_list,
         total=total,
         page=1,
         limit=len(events)
     )
+    content = result.model_dump_json(by_alias=True).encode()
+    event_cache.put(cache_key, version.etag, content)
+    
+    return Response(content=content, media_type="application/json", headers=version_headers(version))
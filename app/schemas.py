@@ -58,6 +58,9 @@ class RcsSendRequest(BaseModel):
     fallback: Optional[List[FallbackBase]] = None
     messages: List[MessageBase]
 
+class SuppressionRequest(BaseModel):
+    numbers: List[str]
+
 class EventsQueryParams(BaseModel):
     limit: Optional[int] = 100
     page: Optional[int] = 1
@@ -87,6 +90,10 @@ class RcsSendResponse(BaseModel):
     class Config:
         populate_by_name = True
 
+class SuppressionResponse(BaseModel):
+    numbers: List[str]
+    invalidNumbers: List[str] = []
+
 class Event(BaseModel):
     eventId: str
     callbackMessageId: str
@@ -113,3 +120,42 @@ class EventsResponse(BaseModel):
     total: int
     page: int
     limit: int
+
+# Compact events: fields shared by a campaign are sent once per page
+class EventCampaign(BaseModel):
+    campaignName: Optional[str] = None
+    campaignId: Optional[str] = None
+    templateId: str
+    templateName: str
+    channel: str
+    channelType: str
+    callbackUrl: Optional[str] = None
+
+class CompactEvent(BaseModel):
+    campaign: int
+    eventId: str
+    callbackMessageId: str
+    messageText: Optional[str] = None
+    messageStatus: str
+    eventType: str
+    eventValue: Optional[str] = None
+    eventDirection: str
+    scheduleTo: Optional[datetime] = None
+    createdAt: datetime
+    updatedAt: Optional[datetime] = None
+    timestamp: datetime
+
+class CompactEventsResponse(BaseModel):
+    accountId: int
+    campaigns: List[EventCampaign]
+    events: List[CompactEvent]
+    total: int
+    page: int
+    limit: int
+
+# Projected events: only the fields requested with ``fields`` are returned
+class ProjectedEventsResponse(BaseModel):
+    events: List[Dict[str, Any]]
+    total: int
+    page: int
+    limit: int
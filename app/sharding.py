@@ -0,0 +1,118 @@
+from fastapi import Depends, HTTPException
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from dotenv import load_dotenv
+from typing import Dict
+import os
+
+from .database import SessionLocal, engine, get_db
+from . import models, auth
+
+load_dotenv()
+
+# Name of the shard that lives on the central database (DATABASE_URL)
+DEFAULT_SHARD = "default"
+
+# Tables that are partitioned by account. Everything else (accounts, users,
+# templates, account_shards) stays on the central database.
+SHARDED_TABLES = ("messages", "events")
+
+def parse_shard_urls(value: str) -> Dict[str, str]:
+    """
+    Parse SHARD_DATABASE_URLS, a comma separated list of name=url pairs.
+    """
+    urls = {}
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, url = item.partition("=")
+        if not sep or not name.strip() or not url.strip():
+            raise ValueError(f"Invalid shard definition: {item}")
+        urls[name.strip()] = url.strip()
+    if DEFAULT_SHARD in urls:
+        raise ValueError(f"Shard name '{DEFAULT_SHARD}' is reserved for DATABASE_URL")
+    return urls
+
+def build_shard_metadata() -> MetaData:
+    """
+    Copy the sharded tables into a standalone MetaData, dropping the foreign
+    keys that point at central tables (they cannot cross databases).
+    """
+    metadata = MetaData()
+    for name in SHARDED_TABLES:
+        table = models.Base.metadata.tables[name].to_metadata(metadata)
+        for constraint in list(table.foreign_key_constraints):
+            if constraint.elements[0].target_fullname.split(".")[0] in SHARDED_TABLES:
+                continue
+            table.constraints.discard(constraint)
+            for element in constraint.elements:
+                element.parent.foreign_keys.discard(element)
+                table.foreign_keys.discard(element)
+    return metadata
+
+class ShardRouter:
+    """
+    Maps accounts to the database holding their messages and events.
+
+    Assignments live in the central ``account_shards`` table; accounts without
+    an assignment are served by DEFAULT_SHARD.
+    """
+
+    def __init__(self, urls: Dict[str, str]):
+        self.engines = {DEFAULT_SHARD: engine}
+        self.sessionmakers = {DEFAULT_SHARD: SessionLocal}
+        for name, url in urls.items():
+            shard_engine = create_engine(url)
+            self.engines[name] = shard_engine
+            self.sessionmakers[name] = sessionmaker(autocommit=False, autoflush=False, bind=shard_engine)
+        self.metadata = build_shard_metadata()
+
+    @property
+    def shard_names(self):
+        return list(self.engines)
+
+    def create_tables(self):
+        for name, shard_engine in self.engines.items():
+            if name != DEFAULT_SHARD:
+                self.metadata.create_all(bind=shard_engine)
+
+    def shard_for(self, db: Session, account_id: int) -> str:
+        assignment = db.get(models.AccountShard, account_id)
+        name = assignment.shard if assignment else DEFAULT_SHARD
+        if name not in self.engines:
+            raise HTTPException(status_code=500, detail=f"Shard '{name}' is not configured")
+        return name
+
+    def session(self, name: str) -> Session:
+        return self.sessionmakers[name]()
+
+    def assign(self, db: Session, account_id: int, name: str):
+        if name not in self.engines:
+            raise ValueError(f"Shard '{name}' is not configured")
+        assignment = db.get(models.AccountShard, account_id)
+        if assignment is None:
+            assignment = models.AccountShard(account_id=account_id, shard=name)
+            db.add(assignment)
+        else:
+            assignment.shard = name
+        db.commit()
+
+shard_router = ShardRouter(parse_shard_urls(os.getenv("SHARD_DATABASE_URLS", "")))
+
+def get_shard_db(
+    account: models.Account = Depends(auth.verify_token),
+    db: Session = Depends(get_db)
+):
+    """
+    Session on the shard holding the authenticated account's messages and events.
+    """
+    name = shard_router.shard_for(db, account.id)
+    if name == DEFAULT_SHARD:
+        yield db
+        return
+    shard_db = shard_router.session(name)
+    try:
+        yield shard_db
+    finally:
+        shard_db.close()
@@ -0,0 +1,238 @@
+import argparse
+import time
+from datetime import timedelta
+from sqlalchemy import bindparam, delete, exists, func, insert, or_, select, text, update
+
+from app.database import SessionLocal
+from app.sharding import SHARDED_TABLES, shard_router
+
+# Column used to match rows that already exist on the target shard, so an
+# interrupted migration can simply be run again.
+UNIQUE_COLUMNS = {
+    "messages": "callback_message_id",
+    "events": "event_id",
+}
+
+def advance_sequence(conn, table, value):
+    """
+    Move the target's id sequence past ``value``, so ids handed out to new
+    rows never collide with rows copied with their source ids. SQLite already
+    numbers new rows after max(id).
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    conn.execute(
+        text(
+            "SELECT setval(pg_get_serial_sequence(:table, 'id'), "
+            "GREATEST(:value, nextval(pg_get_serial_sequence(:table, 'id'))))"
+        ),
+        {"table": table.name, "value": value}
+    )
+
+def renumber(conn, table, rows, floor):
+    """
+    Give rows a new id above both ``floor`` and every id on the target. On
+    PostgreSQL they are left to the sequence, which advance_sequence already
+    moved past ``floor``.
+    """
+    if conn.dialect.name == "postgresql":
+        return rows
+    next_id = max(floor, conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+    return [{**row, "id": next_id + index} for index, row in enumerate(rows)]
+
+def copy_rows(table, source, target, account_id, after_id, batch_size, keep_ids=True):
+    """
+    Copy the account's rows with id > after_id that are missing on target.
+
+    With ``keep_ids`` rows keep their ids, so event stream cursors
+    (Last-Event-ID) stay valid after the move; a row whose id is already used
+    on the target gets a new one above the source's highest id. Without it
+    every row gets a new id above the target's current ones, which is needed
+    once the target serves the account: streams may already be past lower
+    ids, and new ids make them receive the row instead of missing it.
+    Returns the last source id read, the number of rows inserted and how many
+    of them were renumbered.
+    """
+    unique_column = table.c[UNIQUE_COLUMNS[table.name]]
+    copied = renumbered = 0
+
+    while True:
+        with shard_router.engines[source].connect() as conn:
+            floor = conn.execute(select(func.max(table.c.id))).scalar() or 0
+            rows = conn.execute(
+                select(table)
+                .where(table.c.account_id == account_id, table.c.id > after_id)
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).mappings().all()
+        if not rows:
+            return after_id, copied, renumbered
+
+        with shard_router.engines[target].begin() as conn:
+            floor = max(floor, rows[-1]["id"])
+            advance_sequence(conn, table, floor)
+            keys = [row[unique_column.name] for row in rows]
+            existing = set(conn.execute(
+                select(unique_column).where(unique_column.in_(keys))
+            ).scalars())
+            taken_ids = set(conn.execute(
+                select(table.c.id).where(table.c.id.in_([row["id"] for row in rows]))
+            ).scalars())
+            batch = [dict(row) for row in rows if row[unique_column.name] not in existing]
+            kept = [row for row in batch if keep_ids and row["id"] not in taken_ids]
+            moved = [
+                {name: value for name, value in row.items() if name != "id"}
+                for row in batch if not keep_ids or row["id"] in taken_ids
+            ]
+            if kept:
+                conn.execute(insert(table), kept)
+            if moved:
+                conn.execute(insert(table), renumber(conn, table, moved, floor if keep_ids else 0))
+
+        copied += len(batch)
+        renumbered += len(moved)
+        after_id = rows[-1]["id"]
+
+def resync_rows(table, source, target, account_id, up_to_id, since, batch_size):
+    """
+    Copy rows changed on source since ``since`` (status and fallback updates
+    made while the migration ran) over their copy on target, unless the target
+    copy was changed more recently. Returns the number of changed rows.
+    """
+    unique_column = table.c[UNIQUE_COLUMNS[table.name]]
+    columns = [column for column in table.columns if column.name not in ("id", unique_column.name)]
+    statement = update(table).where(
+        unique_column == bindparam("match_key"),
+        or_(table.c.updated_at.is_(None), table.c.updated_at < bindparam("changed_at"))
+    ).values({column.name: bindparam(f"new_{column.name}") for column in columns})
+    after_id = 0
+    changed = 0
+
+    while True:
+        with shard_router.engines[source].connect() as conn:
+            rows = conn.execute(
+                select(table)
+                .where(
+                    table.c.account_id == account_id,
+                    table.c.id > after_id,
+                    table.c.id <= up_to_id,
+                    table.c.updated_at >= since
+                )
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).mappings().all()
+        if not rows:
+            return changed
+
+        with shard_router.engines[target].begin() as conn:
+            conn.execute(statement, [
+                {
+                    "match_key": row[unique_column.name],
+                    "changed_at": row["updated_at"],
+                    **{f"new_{column.name}": row[column.name] for column in columns}
+                }
+                for row in rows
+            ])
+
+        changed += len(rows)
+        after_id = rows[-1]["id"]
+
+def delete_copied_rows(table, source, target, account_id, batch_size):
+    """
+    Remove the account's rows from source once they are present on target,
+    matched by unique key. Messages still referenced by events left on source
+    are kept. Returns the number of rows left on source.
+    """
+    unique_column = table.c[UNIQUE_COLUMNS[table.name]]
+    query = select(table.c.id, unique_column).where(table.c.account_id == account_id)
+    if table.name == "messages":
+        events = shard_router.metadata.tables["events"]
+        query = query.where(~exists().where(events.c.callback_message_id == table.c.callback_message_id))
+    after_id = 0
+    left = 0
+
+    while True:
+        with shard_router.engines[source].connect() as conn:
+            rows = conn.execute(
+                query.where(table.c.id > after_id).order_by(table.c.id).limit(batch_size)
+            ).all()
+        if not rows:
+            return left
+
+        with shard_router.engines[target].connect() as conn:
+            present = set(conn.execute(
+                select(unique_column).where(unique_column.in_([key for _, key in rows]))
+            ).scalars())
+        ids = [row_id for row_id, key in rows if key in present]
+        if ids:
+            with shard_router.engines[source].begin() as conn:
+                conn.execute(delete(table).where(table.c.id.in_(ids)))
+
+        left += len(rows) - len(ids)
+        after_id = rows[-1][0]
+
+def migrate_account(account_id, target, batch_size=1000, grace_seconds=5):
+    if target not in shard_router.engines:
+        raise SystemExit(f"Shard '{target}' is not configured")
+
+    db = SessionLocal()
+    try:
+        source = shard_router.shard_for(db, account_id)
+        if source == target:
+            print(f"Account {account_id} is already on shard '{target}'")
+            return
+
+        # Rows updated on the source from here on are re-synced after the copy.
+        # The margin covers clock differences between the API servers and the database.
+        with shard_router.engines[source].connect() as conn:
+            since = conn.execute(select(func.now())).scalar() - timedelta(seconds=grace_seconds)
+
+        # Messages first: events reference them by callback_message_id
+        tables = [shard_router.metadata.tables[name] for name in SHARDED_TABLES]
+        last_ids = {}
+        for table in tables:
+            last_ids[table.name], copied, renumbered = copy_rows(
+                table, source, target, account_id, 0, batch_size
+            )
+            print(f"Copied {copied} {table.name} rows from '{source}' to '{target}' ({renumbered} renumbered)")
+        for table in tables:
+            changed = resync_rows(table, source, target, account_id, last_ids[table.name], since, batch_size)
+            print(f"Re-synced {changed} changed {table.name} rows")
+
+        shard_router.assign(db, account_id, target)
+        print(f"Account {account_id} now routed to shard '{target}'")
+
+        # Let requests that resolved the old shard finish, then pick up
+        # whatever they wrote or updated while the copy was running. Rows are
+        # matched by unique key rather than id, since ids are assigned before
+        # commit and can land below ones already copied. Source rows are only
+        # removed once present on the target; repeat until none are left.
+        while True:
+            time.sleep(grace_seconds)
+            for table in tables:
+                last_ids[table.name], copied, renumbered = copy_rows(
+                    table, source, target, account_id, 0, batch_size, keep_ids=False
+                )
+                print(f"Copied {copied} late {table.name} rows")
+                changed = resync_rows(table, source, target, account_id, last_ids[table.name], since, batch_size)
+                print(f"Re-synced {changed} changed {table.name} rows")
+
+            left = 0
+            for table in reversed(tables):
+                left += delete_copied_rows(table, source, target, account_id, batch_size)
+            if not left:
+                print(f"Removed the account's rows from '{source}'")
+                break
+            print(f"{left} rows were written to '{source}' meanwhile, copying again")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move an account's messages and events to another shard")
+    parser.add_argument("account_id", type=int)
+    parser.add_argument("target_shard")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--grace-seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    migrate_account(args.account_id, args.target_shard, args.batch_size, args.grace_seconds)